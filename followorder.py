@@ -1,59 +1,347 @@
-from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from solana.rpc.websocket_api import connect
 from solders.pubkey import Pubkey
+from solders.rpc.config import RpcTransactionLogsFilterMentions
 import asyncio
-import json
 import logging
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 import aiohttp
-from typing import List, Dict
+import orjson
+from collections import OrderedDict
+from dataclasses import dataclass, field, is_dataclass
+from typing import List, Dict, Optional
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='smart_wallet_tracker.log'
-)
+class _JsonArgsFormatter(logging.Formatter):
+    """写日志时才把 dataclass 参数序列化为 JSON"""
+
+    def format(self, record):
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                orjson.dumps(arg, option=orjson.OPT_INDENT_2).decode() if is_dataclass(arg) else arg
+                for arg in record.args
+            )
+        return super().format(record)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """不在事件循环中格式化, 由后台线程统一格式化并写文件"""
+
+    def prepare(self, record):
+        return record
+
+
+_log_queue = queue.Queue(-1)
+_file_handler = logging.FileHandler('smart_wallet_tracker.log')
+_file_handler.setFormatter(_JsonArgsFormatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _file_handler)
+_log_listener.start()
+
+logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(_log_queue)])
+
+# 终端输出同样交给单个后台线程, 保证按顺序输出且不阻塞事件循环
+_console_queue = queue.Queue(-1)
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter('%(message)s'))
+_console_listener = QueueListener(_console_queue, _console_handler)
+_console_listener.start()
+
+_console = logging.getLogger("followorder.console")
+_console.propagate = False
+_console.addHandler(_DeferredQueueHandler(_console_queue))
+
+_TRANSFER_TYPES = {"transfer", "transferChecked"}
+_TOKEN_PROGRAMS = {"spl-token", "spl-token-2022"}
+# 只缓存不会变化的代币字段, 价格每次单独查询
+_TOKEN_STATIC_FIELDS = ("symbol", "name", "decimals")
+
+
+def _index_tokens(body: bytes) -> Dict[str, Dict]:
+    return {t["address"]: t for t in orjson.loads(body)}
+
+
+def _is_transient(e: Exception) -> bool:
+    """超时、连接错误、429 与 5xx 视为临时错误, 可以重试"""
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status == 429 or e.status >= 500
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+@dataclass(slots=True)
+class TokenTransfer:
+    token_address: str
+    amount: float
+    direction: str
+    symbol: Optional[str] = None
+    price: Optional[float] = None
+
+
+@dataclass(slots=True)
+class TxRecord:
+    signature: str
+    block_time: Optional[int]
+    token_transfers: List[TokenTransfer] = field(default_factory=list)
+    sol_transfer: float = 0
+
+
+class TokenBucket:
+    """所有协程共享的令牌桶, 限制对同一服务商的总请求速率"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        # 按到达顺序放行, 避免大批量请求被小请求饿死
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, n: int = 1):
+        if n > self.capacity:
+            raise ValueError(f"请求令牌数 {n} 超过令牌桶容量 {self.capacity}")
+        async with self._lock:
+            self._refill()
+            while self.tokens < n:
+                await asyncio.sleep((n - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= n
+
 
 class SmartWalletTracker:
     def __init__(self):
         self.RPC_URL = "https://g.w.lavanet.xyz:443/gateway/solana/"
-        self.client = AsyncClient(self.RPC_URL)
+        self.WS_URL = self.RPC_URL.replace("https://", "wss://", 1)
         
         self.SMART_WALLETS = [
             "99999"
         ]
         
         self.JUPITER_API = "https://price.jup.ag/v4"
+        self.JUPITER_TOKEN_LIST = "https://token.jup.ag/all"
+        self.TOKEN_LIST_REFRESH = 3600
+        # 代币列表有数 MB, 单独放宽超时
+        self.TOKEN_LIST_TIMEOUT = aiohttp.ClientTimeout(total=120)
+
+        # 单次批量请求的最大交易数
+        self.MAX_BATCH_SIZE = 25
+        # 断线补齐时最多向前翻页的次数
+        self.MAX_CATCHUP_PAGES = 40
+
+        # 每秒请求数上限, 按服务商套餐调整; 批量请求按条计数, 容量需不小于批量大小
+        self.rpc_limiter = TokenBucket(rate=20, capacity=self.MAX_BATCH_SIZE)
+        self.jupiter_limiter = TokenBucket(rate=10)
         
-        self.processed_signatures = set()
+        # 已处理签名的防重放窗口, 超出上限时淘汰最早的
+        self.MAX_PROCESSED_SIGNATURES = 100_000
+        self.processed_signatures = OrderedDict()
+        # 每个钱包最近处理过的签名, 轮询时只拉取它之后的新交易
+        self._last_sig: Dict[str, str] = {}
+        # 单个钱包同时分析的交易数上限
+        self.MAX_CONCURRENT_TX = 8
+        # 获取不到的交易 (节点尚未同步等) 稍后重试, 超过次数后放弃
+        self.MAX_TX_RETRIES = 5
+        self.TX_RETRY_DELAY = 2
+        self._tx_retries: Dict[str, int] = {}
+
+        self._http = None
+
+        # 代币元数据不可变, 缓存后不再重复请求
+        self.TOKEN_CACHE_SIZE = 10_000
+        self._token_cache: Dict[str, Dict] = {}
+        # Jupiter 全量代币列表, 启动时拉取并定期刷新
+        self._token_list: Dict[str, Dict] = {}
+        # 正在请求中的代币, 并发调用共享同一个请求
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def _session(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                # Jupiter 与 RPC 共用一个会话, 每个 host 的连接池需覆盖批量/并发请求
+                connector=aiohttp.TCPConnector(
+                    limit=200,
+                    limit_per_host=64,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60,
+                    enable_cleanup_closed=True
+                )
+            )
+        return self._http
+
+    async def close(self):
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+
+    async def load_token_list(self):
+        try:
+            await self.jupiter_limiter.acquire()
+            session = await self._session()
+            async with session.get(self.JUPITER_TOKEN_LIST, timeout=self.TOKEN_LIST_TIMEOUT) as response:
+                response.raise_for_status()
+                body = await response.read()
+            # 解析与建索引放到线程中, 避免阻塞各钱包的监控
+            self._token_list = await asyncio.to_thread(_index_tokens, body)
+            logging.info(f"已加载代币列表: {len(self._token_list)} 个代币")
+        except Exception as e:
+            logging.error(f"加载代币列表失败: {str(e)}")
+
+    async def refresh_token_list(self):
+        while True:
+            await asyncio.sleep(self.TOKEN_LIST_REFRESH)
+            await self.load_token_list()
 
     async def get_token_info(self, token_address: str) -> Dict:
+        if token_address in self._token_list:
+            return self._token_list[token_address]
+        if token_address in self._token_cache:
+            return self._token_cache[token_address]
+
+        task = self._inflight.get(token_address)
+        if task is None:
+            # 请求作为独立任务运行, 不属于任何调用方
+            task = asyncio.ensure_future(self._fetch_token_info(token_address))
+            self._inflight[token_address] = task
+            task.add_done_callback(lambda _: self._inflight.pop(token_address, None))
+        # shield: 任一调用方被取消都不会取消共享的请求
+        return await asyncio.shield(task)
+
+    async def get_token_prices(self, token_addresses: List[str]) -> Dict[str, float]:
+        """价格会变化, 不做缓存; 每批交易涉及的代币一次性查询"""
+        try:
+            await self.jupiter_limiter.acquire()
+            session = await self._session()
+            params = {"ids": ",".join(token_addresses)}
+            async with session.get(f"{self.JUPITER_API}/price", params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())["data"]
+            return {address: info["price"] for address, info in data.items()}
+        except Exception as e:
+            logging.error(f"获取代币价格失败: {str(e)}")
+            return {}
+
+    async def _fetch_token_info(self, token_address: str) -> Dict:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.JUPITER_API}/token/{token_address}") as response:
-                    if response.status == 200:
-                        return await response.json()
+            await self.jupiter_limiter.acquire()
+            session = await self._session()
+            async with session.get(f"{self.JUPITER_API}/token/{token_address}") as response:
+                if response.status == 200:
+                    body = orjson.loads(await response.read())
+                    data = {k: body.get(k) for k in _TOKEN_STATIC_FIELDS}
+                    if len(self._token_cache) >= self.TOKEN_CACHE_SIZE:
+                        self._token_cache.pop(next(iter(self._token_cache)))
+                    self._token_cache[token_address] = data
+                    return data
             return None
         except Exception as e:
             logging.error(f"获取代币信息失败: {str(e)}")
             return None
 
-    async def analyze_transaction(self, tx_sig: str) -> Dict:
+    def _get_transaction_request(self, request_id: int, tx_sig: str) -> Dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "getTransaction",
+            "params": [tx_sig, {
+                "encoding": "jsonParsed",
+                "commitment": "confirmed",
+                "maxSupportedTransactionVersion": 0
+            }]
+        }
+
+    async def _with_retry(self, coro_fn, attempts: int = 5):
+        for i in range(attempts):
+            try:
+                return await coro_fn()
+            except Exception as e:
+                if not _is_transient(e) or i == attempts - 1:
+                    raise
+                delay = min(2 ** i, 30) + random.random()
+                logging.warning(f"RPC 请求失败, {delay:.1f} 秒后重试: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def _post(self, payload):
+        async def _send():
+            await self.rpc_limiter.acquire(len(payload) if isinstance(payload, list) else 1)
+            session = await self._session()
+            async with session.post(self.RPC_URL, json=payload) as response:
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+
+        return await self._with_retry(_send)
+
+    async def _rpc(self, request: Dict):
+        reply = await self._post(request)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply.get("result")
+
+    async def get_signatures(self, wallet_address: str, limit: int, until: str = None, before: str = None) -> List[Dict]:
+        config = {"limit": limit, "commitment": "confirmed"}
+        if until:
+            config["until"] = until
+        if before:
+            config["before"] = before
+        return await self._rpc({
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "getSignaturesForAddress",
+            "params": [wallet_address, config]
+        })
+
+    async def get_transaction(self, tx_sig: str) -> Dict:
+        return await self._rpc(self._get_transaction_request(0, tx_sig))
+
+    async def get_transactions(self, signatures: List[str]) -> List[Dict]:
+        """一次 JSON-RPC 批量请求获取多笔交易, 结果按签名顺序返回"""
+        payload = [self._get_transaction_request(i, sig) for i, sig in enumerate(signatures)]
+        replies = await self._post(payload)
+
+        results = [None] * len(signatures)
+        for reply in replies:
+            if "error" in reply:
+                logging.error(f"获取交易失败 {signatures[reply['id']]}: {reply['error']}")
+                continue
+            results[reply["id"]] = reply.get("result")
+        return results
+
+    async def analyze_transaction(self, wallet_address: str, tx_sig: str, tx: Dict = None) -> Optional[TxRecord]:
         try:
-            tx = await self.client.get_transaction(tx_sig)
-            if not tx.value:
+            if tx is None:
+                tx = await self.get_transaction(tx_sig)
+            if not tx:
                 return None
 
-            transaction_data = {
-                "timestamp": datetime.fromtimestamp(tx.value.block_time).strftime('%Y-%m-%d %H:%M:%S'),
-                "signature": tx_sig,
-                "token_transfers": [],
-                "sol_transfer": 0
+            transaction_data = TxRecord(signature=tx_sig, block_time=tx["blockTime"])
+
+            meta = tx["meta"]
+            instructions = list(tx["transaction"]["message"]["instructions"])
+            for inner in meta.get("innerInstructions") or []:
+                instructions.extend(inner["instructions"])
+
+            # 代币账户 -> 余额信息 (mint / owner / decimals)
+            account_keys = tx["transaction"]["message"]["accountKeys"]
+            token_accounts = {
+                account_keys[b["accountIndex"]]["pubkey"]: b
+                for b in (meta.get("preTokenBalances") or []) + (meta.get("postTokenBalances") or [])
             }
 
-            for log in tx.value.transaction.meta.log_messages:
-                if "Transfer" in log:
-                    await self.parse_transfer_log(log, transaction_data)
+            for ix in instructions:
+                parsed = ix.get("parsed")
+                if (
+                    ix.get("program") in _TOKEN_PROGRAMS
+                    and isinstance(parsed, dict)
+                    and parsed.get("type") in _TRANSFER_TYPES
+                ):
+                    await self.parse_transfer(wallet_address, parsed["info"], token_accounts, transaction_data)
 
             return transaction_data
 
@@ -61,67 +349,222 @@ class SmartWalletTracker:
             logging.error(f"分析交易失败: {str(e)}")
             return None
 
-    async def parse_transfer_log(self, log: str, transaction_data: Dict):
+    async def parse_transfer(self, wallet_address: str, info: Dict, token_accounts: Dict, transaction_data: TxRecord):
         try:
-            if "Transfer" in log:
-                token_info = {
-                    "token_address": "从日志中解析",
-                    "amount": "从日志中解析",
-                    "direction": "in/out"
-                }
-                
-                token_details = await self.get_token_info(token_info["token_address"])
-                if token_details:
-                    token_info.update(token_details)
-                
-                transaction_data["token_transfers"].append(token_info)
+            source = token_accounts.get(info["source"], {})
+            destination = token_accounts.get(info["destination"], {})
+
+            if wallet_address in (info.get("authority"), source.get("owner")):
+                direction = "out"
+            elif destination.get("owner") == wallet_address:
+                direction = "in"
+            else:
+                return
+
+            token_address = info.get("mint") or source.get("mint") or destination.get("mint")
+            if not token_address:
+                return
+
+            if "tokenAmount" in info:
+                # 数额过大时 uiAmount 为 null, 用字符串形式
+                amount = float(info["tokenAmount"]["uiAmountString"])
+            else:
+                decimals = (source or destination)["uiTokenAmount"]["decimals"]
+                amount = int(info["amount"]) / 10 ** decimals
+
+            token_info = TokenTransfer(token_address=token_address, amount=amount, direction=direction)
+
+            token_details = await self.get_token_info(token_address)
+            if token_details:
+                token_info.symbol = token_details.get("symbol")
+
+            transaction_data.token_transfers.append(token_info)
 
         except Exception as e:
-            logging.error(f"解析转账日志失败: {str(e)}")
+            logging.error(f"解析转账失败: {str(e)}")
 
-    async def monitor_wallet(self, wallet_address: str):
+    async def process_signatures(self, wallet_address: str, new_sigs: List[str]) -> List[str]:
+        """处理一批签名, 返回尚未成功获取、需要稍后重试的签名"""
         try:
-            while True:
-                signatures = await self.client.get_signatures_for_address(
-                    Pubkey.from_string(wallet_address),
-                    limit=10
-                )
+            txs = await self.get_transactions(new_sigs)
+        except Exception as e:
+            # 节点不支持批量请求时逐笔并发获取
+            logging.warning(f"批量获取交易失败, 改为逐笔获取: {str(e)}")
+            txs = [None] * len(new_sigs)
 
-                for sig in signatures.value:
-                    if sig.signature not in self.processed_signatures:
-                        tx_data = await self.analyze_transaction(sig.signature)
-                        if tx_data and tx_data["token_transfers"]:
-                            self.process_transaction(wallet_address, tx_data)
-                        self.processed_signatures.add(sig.signature)
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_TX)
 
-                await asyncio.sleep(1) 
+        async def _one(sig, tx):
+            async with sem:
+                return sig, await self.analyze_transaction(wallet_address, sig, tx)
 
-        except Exception as e:
-            logging.error(f"监控钱包失败 {wallet_address}: {str(e)}")
+        results = await asyncio.gather(*[_one(sig, tx) for sig, tx in zip(new_sigs, txs)])
+
+        transfers = [t for _, tx_data in results if tx_data for t in tx_data.token_transfers]
+        if transfers:
+            prices = await self.get_token_prices(list({t.token_address for t in transfers}))
+            for transfer in transfers:
+                transfer.price = prices.get(transfer.token_address)
+
+        unresolved = []
+        for sig, tx_data in results:
+            if tx_data is None:
+                attempts = self._tx_retries.get(sig, 0) + 1
+                if attempts < self.MAX_TX_RETRIES:
+                    self._tx_retries[sig] = attempts
+                    unresolved.append(sig)
+                    continue
+                logging.error(f"交易多次获取失败, 放弃: {sig}")
+            elif tx_data.token_transfers:
+                self.process_transaction(wallet_address, tx_data)
+
+            self._tx_retries.pop(sig, None)
+            self.processed_signatures[sig] = None
+            if len(self.processed_signatures) > self.MAX_PROCESSED_SIGNATURES:
+                self.processed_signatures.popitem(last=False)
+        return unresolved
+
+    async def poll_wallet(self, wallet_address: str) -> bool:
+        """从 _last_sig 起补齐交易, 全部获取成功时才推进 _last_sig"""
+        last_sig = self._last_sig.get(wallet_address)
+        signatures = await self.get_signatures(wallet_address, limit=self.MAX_BATCH_SIZE, until=last_sig)
+
+        # 整页返回说明 until 之前可能还有交易, 继续向前翻页 (首次启动只取最新一页)
+        pages = 1
+        page = signatures
+        while last_sig and len(page) == self.MAX_BATCH_SIZE:
+            if pages >= self.MAX_CATCHUP_PAGES:
+                logging.warning(f"钱包 {wallet_address} 补齐超过 {pages} 页, 更早的交易将被跳过")
+                break
+            page = await self.get_signatures(
+                wallet_address,
+                limit=self.MAX_BATCH_SIZE,
+                until=last_sig,
+                before=page[-1]["signature"]
+            )
+            signatures.extend(page)
+            pages += 1
+
+        # 从旧到新按批处理
+        new_sigs = [
+            s["signature"] for s in reversed(signatures)
+            if s["signature"] not in self.processed_signatures
+        ]
+        unresolved = []
+        for i in range(0, len(new_sigs), self.MAX_BATCH_SIZE):
+            unresolved += await self.process_signatures(wallet_address, new_sigs[i:i + self.MAX_BATCH_SIZE])
+
+        if signatures and not unresolved:
+            self._last_sig[wallet_address] = signatures[0]["signature"]
+        return not unresolved
+
+    async def drain_signatures(self, wallet_address: str, pending: asyncio.Queue, gap: bool = False):
+        """把已到达的通知合并成一次批量处理, 不阻塞 websocket 读取"""
+        while True:
+            if gap:
+                # 有交易未能获取: 稍后从 _last_sig 起重新轮询, 在此之前不推进 _last_sig
+                await asyncio.sleep(self.TX_RETRY_DELAY)
+                try:
+                    gap = not await self.poll_wallet(wallet_address)
+                except Exception as e:
+                    logging.error(f"补齐交易失败 {wallet_address}: {str(e)}")
+                continue
+
+            sigs = [await pending.get()]
+            while not pending.empty() and len(sigs) < self.MAX_BATCH_SIZE:
+                sigs.append(pending.get_nowait())
+
+            new_sigs = [sig for sig in dict.fromkeys(sigs) if sig not in self.processed_signatures]
+            if not new_sigs:
+                continue
+            try:
+                unresolved = await self.process_signatures(wallet_address, new_sigs)
+            except Exception as e:
+                logging.error(f"处理新交易失败 {wallet_address}: {str(e)}")
+                unresolved = new_sigs
+
+            if unresolved:
+                gap = True
+            else:
+                self._last_sig[wallet_address] = new_sigs[-1]
+
+    async def monitor_wallet(self, wallet_address: str):
+        delay = 1
+        while True:
+            worker = None
+            try:
+                async with connect(self.WS_URL) as websocket:
+                    await websocket.logs_subscribe(
+                        RpcTransactionLogsFilterMentions(Pubkey.from_string(wallet_address)),
+                        commitment=Confirmed
+                    )
+                    await websocket.recv()  # 订阅确认
+                    delay = 1
+
+                    # 补齐连接建立前遗漏的交易
+                    complete = await self.poll_wallet(wallet_address)
+
+                    pending = asyncio.Queue()
+                    worker = asyncio.create_task(self.drain_signatures(wallet_address, pending, gap=not complete))
+
+                    async for msgs in websocket:
+                        # 处理任务意外退出时重连, 由补齐轮询接上遗漏的交易
+                        if worker.done():
+                            error = None if worker.cancelled() else worker.exception()
+                            raise RuntimeError(f"交易处理任务已退出: {error}")
+                        for msg in msgs:
+                            value = msg.result.value
+                            sig = str(value.signature)
+                            if value.err or sig in self.processed_signatures:
+                                continue
+                            pending.put_nowait(sig)
 
-    def process_transaction(self, wallet_address: str, tx_data: Dict):
+            except Exception as e:
+                logging.error(f"监控钱包失败 {wallet_address}: {str(e)}")
+            finally:
+                # 未处理的通知由重连后的补齐轮询兜底
+                if worker is not None:
+                    worker.cancel()
+
+            logging.warning(f"钱包 {wallet_address} 连接断开, {delay} 秒后重连")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def process_transaction(self, wallet_address: str, tx_data: TxRecord):
         try:
+            if tx_data.block_time is None:
+                timestamp = "未知"
+            else:
+                timestamp = datetime.fromtimestamp(tx_data.block_time).strftime('%Y-%m-%d %H:%M:%S')
+
             # 打印交易信息
-            print(f"\n🔍 发现新交易!")
-            print(f"钱包地址: {wallet_address}")
-            print(f"交易时间: {tx_data['timestamp']}")
-            print(f"交易签名: {tx_data['signature']}")
-            
-            for transfer in tx_data["token_transfers"]:
-                direction = "买入 ⬇️" if transfer["direction"] == "in" else "卖出 ⬆️"
-                print(f"{direction} {transfer['amount']} {transfer.get('symbol', 'Unknown Token')}")
-                if transfer.get("price"):
-                    print(f"价格: ${transfer['price']}")
-                    
-            logging.info(f"新交易: {json.dumps(tx_data, indent=2)}")
+            lines = [
+                f"\n🔍 发现新交易!",
+                f"钱包地址: {wallet_address}",
+                f"交易时间: {timestamp}",
+                f"交易签名: {tx_data.signature}"
+            ]
+
+            for transfer in tx_data.token_transfers:
+                direction = "买入 ⬇️" if transfer.direction == "in" else "卖出 ⬆️"
+                lines.append(f"{direction} {transfer.amount} {transfer.symbol or 'Unknown Token'}")
+                if transfer.price:
+                    lines.append(f"价格: ${transfer.price}")
+
+            _console.info("\n".join(lines))
+
+            logging.info("新交易: %s", tx_data)
 
         except Exception as e:
             logging.error(f"处理交易数据失败: {str(e)}")
 
     async def start_monitoring(self):
         print("开始监控智能钱包...")
-        
+
+        await self.load_token_list()
+
         tasks = [self.monitor_wallet(wallet) for wallet in self.SMART_WALLETS]
+        tasks.append(self.refresh_token_list())
         await asyncio.gather(*tasks)
 
 async def main():
@@ -132,6 +575,10 @@ async def main():
         print("监控已停止")
     except Exception as e:
         logging.error(f"主程序错误: {str(e)}")
-        
+    finally:
+        await tracker.close()
+        _log_listener.stop()
+        _console_listener.stop()
+
 if __name__ == "__main__":
     asyncio.run(main())